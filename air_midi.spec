@@ -18,6 +18,7 @@ a = Analysis(
         'mido.backends.rtmidi',
         'rtmidi',
         'threading',
+        'multiprocessing',
         'json',
         'math',
         'time'
@@ -1,20 +1,34 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
+import os
+import time
 import threading
+import queue
+import logging
 from typing import Dict, Set, Optional
 import cv2
+import numpy as np
 from PIL import Image, ImageTk
 
 from midi_controller_mido import MIDIController
 from piano_roll import PianoRoll
 from config_manager import ConfigManager
 from gesture_recognition import GestureRecognizer
+from gesture_worker import GestureWorkerClient
+
+log = logging.getLogger(__name__)
+
+# Size of the live camera view (width, height)
+CAMERA_VIEW_SIZE = (800, 600)
+CAMERA_IDLE_TEXT = "Camera not active\nClick 'Start Gesture Mode' to begin"
 
 class ChordEditor:
     """Main GUI application for chord editing and gesture recognition"""
     
-    def __init__(self):
-        self.root = tk.Tk()
+    def __init__(self, root: Optional[tk.Tk] = None):
+        # Reuse a root created by the caller (main.py) instead of starting Tk again
+        self.root = root if root is not None else tk.Tk()
+        self.root.deiconify()
         self.root.title("Air MIDI - Hand Gesture Chord Controller")
         self.root.geometry("1600x1200")  # Much larger window for 800x600 camera view
         self.root.resizable(True, True)
@@ -22,22 +36,101 @@ class ChordEditor:
         # Application components
         self.config_manager = ConfigManager()
         self.midi_controller = MIDIController()
-        self.gesture_recognizer = GestureRecognizer()
+        if self.config_manager.get_gesture_settings().get('use_worker_process'):
+            # MediaPipe runs in its own process; frames arrive through shared memory
+            self.gesture_recognizer = GestureWorkerClient()
+        else:
+            self.gesture_recognizer = GestureRecognizer()
+        
+        # OpenCV threading and OpenCL choice for the display conversion
+        self._use_umat = False
+        self.configure_opencv()
         
         # GUI state
         self.current_chord = 1
         self.chord_buttons: Dict[int, tk.Button] = {}
+        self._selected_btn: Optional[tk.Button] = None
         self.is_gesture_mode = False
         self.gesture_thread = None
+        self.display_thread = None
+        self._last_device_list = None  # Device list currently shown in the combobox
+        self._cached_devices: Dict[int, str] = {}
         self.camera_running = False
         self.currently_playing_chord = 0  # Track which chord is currently playing
         
+        # Raw frames from the gesture thread waiting for display conversion
+        self._display_queue = queue.Queue(maxsize=1)
+        
+        # Single-slot buffer between the display thread and the Tk thread.
+        # Only the most recent frame is kept; older ones are dropped.
+        self._latest_frame = None
+        self._frame_lock = threading.Lock()
+        
+        # Preallocated conversion buffers; display frames cycle through a free pool
+        self._rgb_src = None
+        self._free_buffers = queue.Queue()
+        self._drain_job = None
+        self._display_visible = True  # Updated by the Tk thread on each drain
+        
+        # Reused camera image; new frames are pasted into it in place
+        self._photo = None
+        
+        # Piano roll edits waiting to be committed (coalesces drag updates)
+        self._pending_notes = None
+        self._commit_job = None
+        
+        # Note set of each chord, rebuilt only when the chord changes
+        self._chord_sets = {i: frozenset(self.midi_controller.get_chord(i)) for i in range(1, 6)}
+        
         self.setup_gui()
         
         # Load configuration after GUI is set up
         self.load_configuration()
         self.update_chord_display()
         
+    def configure_opencv(self):
+        """Size OpenCV's thread pool and pick the fastest display conversion path"""
+        # MediaPipe already keeps cores busy; a smaller pool avoids oversubscription
+        threads = self.config_manager.get_gesture_settings().get('opencv_threads')
+        if threads is None:
+            threads = max(1, (os.cpu_count() or 4) // 2)
+        cv2.setNumThreads(threads)
+        
+        self._use_umat = self._probe_opencl()
+    
+    def _probe_opencl(self) -> bool:
+        """Time the display conversion with UMat and ndarray; return True if UMat wins"""
+        if not cv2.ocl.haveOpenCL():
+            return False
+        cv2.ocl.setUseOpenCL(True)
+        
+        frame = np.zeros((480, 640, 3), dtype=np.uint8)
+        
+        def convert_umat():
+            rgb = cv2.cvtColor(cv2.UMat(frame), cv2.COLOR_BGR2RGB)
+            cv2.resize(rgb, CAMERA_VIEW_SIZE, interpolation=cv2.INTER_AREA).get()
+        
+        def convert_ndarray():
+            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            cv2.resize(rgb, CAMERA_VIEW_SIZE, interpolation=cv2.INTER_AREA)
+        
+        try:
+            convert_umat()  # First call compiles the OpenCL kernels
+            timings = []
+            for convert in (convert_umat, convert_ndarray):
+                start = time.perf_counter()
+                convert()
+                convert()
+                timings.append(time.perf_counter() - start)
+        except cv2.error as e:
+            log.warning("OpenCL probe failed: %s", e)
+            timings = None
+        
+        use_umat = timings is not None and timings[0] < timings[1]
+        if not use_umat:
+            cv2.ocl.setUseOpenCL(False)
+        return use_umat
+    
     def setup_gui(self):
         """Setup the main GUI interface"""
         # Main container
@@ -149,13 +242,16 @@ class ChordEditor:
         self.piano_roll.pack(pady=(0, 10))
         self.piano_roll.on_note_change = self.on_piano_notes_changed
         
-        # Camera view frame (initially hidden)
+        # Camera view frame - always packed so toggling gesture mode doesn't re-layout
         self.camera_frame = ttk.LabelFrame(piano_frame, text="Camera View - Hand Gesture Recognition", padding="10")
         
+        # Gray placeholder shown while the camera is off, built once and reused
+        self._idle_photo = ImageTk.PhotoImage(Image.new('RGB', CAMERA_VIEW_SIZE, (211, 211, 211)))
+        
         # Much larger camera display - size it for 800x600 camera view
-        self.camera_label = tk.Label(self.camera_frame, text="Camera not active\nClick 'Start Gesture Mode' to begin", 
-                                   width=100, height=40, bg='lightgray', font=('Arial', 14), 
-                                   justify=tk.CENTER)
+        self.camera_label = tk.Label(self.camera_frame, text=CAMERA_IDLE_TEXT, image=self._idle_photo,
+                                   compound=tk.CENTER, width=CAMERA_VIEW_SIZE[0], height=CAMERA_VIEW_SIZE[1],
+                                   bg='lightgray', font=('Arial', 14), justify=tk.CENTER)
         self.camera_label.pack()
         
         # Chord info
@@ -165,6 +261,8 @@ class ChordEditor:
         ttk.Label(info_frame, text="Selected Notes:").pack(anchor=tk.W)
         self.chord_info_label = ttk.Label(info_frame, text="None", font=('TkDefaultFont', 10, 'bold'))
         self.chord_info_label.pack(anchor=tk.W)
+        
+        self.camera_frame.pack(pady=(10, 0))
     
     def setup_status_bar(self, parent):
         """Setup the status bar"""
@@ -182,35 +280,47 @@ class ChordEditor:
         menubar = tk.Menu(self.root)
         self.root.config(menu=menubar)
         
-        # File menu
-        file_menu = tk.Menu(menubar, tearoff=0)
-        menubar.add_cascade(label="File", menu=file_menu)
-        file_menu.add_command(label="Save Configuration", command=self.save_configuration)
-        file_menu.add_command(label="Load Configuration", command=self.load_configuration)
-        file_menu.add_separator()
-        file_menu.add_command(label="Export Chords", command=self.export_chords)
-        file_menu.add_command(label="Import Chords", command=self.import_chords)
-        file_menu.add_separator()
-        file_menu.add_command(label="Exit", command=self.on_closing)
-        
-        # Settings menu
-        settings_menu = tk.Menu(menubar, tearoff=0)
-        menubar.add_cascade(label="Settings", menu=settings_menu)
-        settings_menu.add_command(label="Reset to Defaults", command=self.reset_to_defaults)
-        
-        # Help menu
-        help_menu = tk.Menu(menubar, tearoff=0)
-        menubar.add_cascade(label="Help", menu=help_menu)
-        help_menu.add_command(label="About", command=self.show_about)
+        # (menu label, entries); None marks a separator
+        menus = (
+            ("File", (
+                ("Save Configuration", self.save_configuration),
+                ("Load Configuration", self.load_configuration),
+                None,
+                ("Export Chords", self.export_chords),
+                ("Import Chords", self.import_chords),
+                None,
+                ("Exit", self.on_closing),
+            )),
+            ("Settings", (
+                ("Reset to Defaults", self.reset_to_defaults),
+            )),
+            ("Help", (
+                ("About", self.show_about),
+            )),
+        )
+        
+        for menu_label, entries in menus:
+            menu = tk.Menu(menubar, tearoff=0)
+            menubar.add_cascade(label=menu_label, menu=menu)
+            for entry in entries:
+                if entry is None:
+                    menu.add_separator()
+                else:
+                    label, command = entry
+                    menu.add_command(label=label, command=command)
     
     def select_chord(self, chord_number: int):
         """Select a chord for editing"""
-        # Update button states
-        for i, btn in self.chord_buttons.items():
-            if i == chord_number:
-                btn.config(relief=tk.SUNKEN, bg='lightblue')
-            else:
-                btn.config(relief=tk.RAISED, bg='SystemButtonFace')
+        # Apply outstanding edits to the chord they were made on
+        self._commit_notes()
+        
+        # Update button states - only the old and new selection change
+        btn = self.chord_buttons[chord_number]
+        if self._selected_btn is not btn:
+            if self._selected_btn is not None:
+                self._selected_btn.config(relief=tk.RAISED, bg='SystemButtonFace')
+            btn.config(relief=tk.SUNKEN, bg='lightblue')
+            self._selected_btn = btn
         
         self.current_chord = chord_number
         self.update_chord_display()
@@ -218,7 +328,7 @@ class ChordEditor:
     
     def update_chord_display(self):
         """Update the piano roll to show the current chord"""
-        chord_notes = set(self.midi_controller.get_chord(self.current_chord))
+        chord_notes = self._chord_sets.get(self.current_chord, frozenset())
         self.piano_roll.set_selected_notes(chord_notes, notify=False)
         
         # Update chord info
@@ -228,17 +338,54 @@ class ChordEditor:
         else:
             self.chord_info_label.config(text=f"Chord {self.current_chord}: Empty")
     
+    def set_chord_notes(self, chord_number: int, notes):
+        """Set a chord on the MIDI controller and refresh its cached note set"""
+        self.midi_controller.set_chord(chord_number, notes)
+        self._chord_sets[chord_number] = frozenset(self.midi_controller.get_chord(chord_number))
+    
     def on_piano_notes_changed(self, notes: Set[int]):
-        """Handle piano roll note changes"""
-        self.midi_controller.set_chord(self.current_chord, list(notes))
-        self.config_manager.set_chord(self.current_chord, list(notes))
+        """Handle piano roll note changes, coalescing bursts into one update"""
+        self._pending_notes = notes  # Frozen snapshot from the piano roll
+        if self._commit_job is not None:
+            self.root.after_cancel(self._commit_job)
+        self._commit_job = self.root.after(50, self._commit_notes)
+    
+    def _commit_notes(self):
+        """Apply pending piano roll notes to the current chord"""
+        if self._commit_job is not None:
+            self.root.after_cancel(self._commit_job)
+            self._commit_job = None
+        
+        if self._pending_notes is None:
+            return
+        
+        # Convert once and share the snapshot between both setters
+        notes = sorted(self._pending_notes)
+        self._pending_notes = None
+        self.set_chord_notes(self.current_chord, notes)
+        self.config_manager.set_chord(self.current_chord, notes)
         self.update_chord_display()
     
+    def _discard_pending_notes(self):
+        """Drop piano roll edits that have not been committed yet"""
+        self._pending_notes = None
+        self._commit_notes()
+    
     def refresh_midi_devices(self):
         """Refresh the list of available MIDI devices"""
         devices = self.midi_controller.list_devices()
+        self._cached_devices = devices
         device_list = [f"{i}: {name}" for i, name in devices.items()]
         
+        # Nothing changed since the last refresh - keep the combobox and connection as-is
+        if device_list == self._last_device_list:
+            if device_list:
+                self.status_label.config(text=f"Found {len(device_list)} MIDI device(s)")
+            else:
+                self.status_label.config(text="No MIDI devices found")
+            return
+        
+        self._last_device_list = device_list
         self.midi_device_combo['values'] = device_list
         
         if device_list:
@@ -267,7 +414,7 @@ class ChordEditor:
         selection = self.midi_device_var.get()
         if selection:
             device_id = int(selection.split(':')[0])
-            devices = self.midi_controller.list_devices()
+            devices = self._cached_devices  # Enumerated by the last refresh
             if self.midi_controller.connect(device_id):
                 self.connection_label.config(text=f"MIDI: Connected ({len(devices)} available)", foreground='green')
                 self.config_manager.set_midi_settings(device_id=device_id)
@@ -283,7 +430,7 @@ class ChordEditor:
     
     def play_current_chord(self):
         """Play the currently selected chord"""
-        if not self.midi_controller.outport:
+        if not self.midi_controller.is_connected():
             messagebox.showwarning("MIDI Not Connected", "Please connect to a MIDI device first.")
             return
         
@@ -292,25 +439,27 @@ class ChordEditor:
     
     def clear_current_chord(self):
         """Clear the currently selected chord"""
-        self.midi_controller.set_chord(self.current_chord, [])
+        self._discard_pending_notes()
+        self.set_chord_notes(self.current_chord, [])
         self.config_manager.set_chord(self.current_chord, [])
         self.update_chord_display()
         self.status_label.config(text=f"Cleared Chord {self.current_chord}")
     
     def test_all_chords(self):
         """Play all chords in sequence"""
-        if not self.midi_controller.outport:
+        if not self.midi_controller.is_connected():
             messagebox.showwarning("MIDI Not Connected", "Please connect to a MIDI device first.")
             return
         
-        def play_sequence():
-            for i in range(1, 6):
-                self.root.after(0, lambda x=i: self.status_label.config(text=f"Playing Chord {x}"))
-                self.midi_controller.play_chord(i, duration=1.5)
-                threading.Event().wait(2.0)
-            self.root.after(0, lambda: self.status_label.config(text="Chord test complete"))
+        def play_step(chord_number):
+            if chord_number > 5:
+                self.status_label.config(text="Chord test complete")
+                return
+            self.status_label.config(text=f"Playing Chord {chord_number}")
+            self.midi_controller.play_chord(chord_number, duration=1.5)
+            self.root.after(2000, play_step, chord_number + 1)
         
-        threading.Thread(target=play_sequence, daemon=True).start()
+        self.root.after(0, play_step, 1)
     
     def toggle_gesture_mode(self):
         """Toggle gesture recognition mode"""
@@ -321,18 +470,45 @@ class ChordEditor:
     
     def start_gesture_mode(self):
         """Start gesture recognition"""
-        if not self.midi_controller.outport:
+        if not self.midi_controller.is_connected():
             messagebox.showwarning("MIDI Not Connected", "Please connect to a MIDI device first.")
             return
         
-        if not self.gesture_recognizer.start_camera():
+        # Opening the camera (and, in worker mode, importing MediaPipe in the child
+        # process) can take seconds, so do it off the Tk thread
+        self.gesture_button.config(state=tk.DISABLED)
+        self.status_label.config(text="Starting camera...")
+        threading.Thread(target=self._open_camera, daemon=True).start()
+    
+    def _open_camera(self):
+        """Open the camera in the background and report back to the Tk thread"""
+        try:
+            opened = self.gesture_recognizer.start_camera()
+        except Exception as e:
+            log.exception("Camera start error: %s", e)
+            opened = False
+        try:
+            self.root.after(0, self._finish_gesture_start, opened)
+        except (tk.TclError, RuntimeError):
+            # The window closed while the camera was starting
+            self.gesture_recognizer.stop_camera()
+    
+    def _finish_gesture_start(self, opened: bool):
+        """Enter gesture mode once the camera is open"""
+        self.gesture_button.config(state=tk.NORMAL)
+        if not opened:
+            self.status_label.config(text="Gesture mode stopped")
             messagebox.showerror("Camera Error", "Could not access camera.")
             return
         
         self.is_gesture_mode = True
         self.camera_running = True
         self.gesture_button.config(text="Stop Gesture Mode")
-        self.camera_frame.pack(pady=(10, 0))
+        
+        # Create the camera image once and paste each new frame into it
+        if self._photo is None:
+            self._photo = ImageTk.PhotoImage(Image.new('RGB', CAMERA_VIEW_SIZE))
+        self.camera_label.config(image=self._photo, text="")
         
         # Note: We don't clear piano roll selection as it doesn't interfere with gesture chords
         
@@ -340,6 +516,18 @@ class ChordEditor:
         self.gesture_thread = threading.Thread(target=self.gesture_recognition_loop, daemon=True)
         self.gesture_thread.start()
         
+        # Three display buffers: one being drawn, one waiting, one being written
+        self._free_buffers = queue.Queue()
+        for _ in range(3):
+            self._free_buffers.put(np.empty((CAMERA_VIEW_SIZE[1], CAMERA_VIEW_SIZE[0], 3), dtype=np.uint8))
+        
+        # Color conversion and resizing run on their own thread, overlapping inference
+        self.display_thread = threading.Thread(target=self.display_preprocess_loop, daemon=True)
+        self.display_thread.start()
+        
+        # Refresh the camera view from the Tk thread at ~30 FPS
+        self._drain_job = self.root.after(33, self._drain_frame)
+        
         self.status_label.config(text="Gesture mode active - Show your right hand to the camera")
     
     def stop_gesture_mode(self):
@@ -347,7 +535,23 @@ class ChordEditor:
         self.is_gesture_mode = False
         self.camera_running = False
         self.gesture_button.config(text="Start Gesture Mode")
-        self.camera_frame.pack_forget()
+        self.camera_label.config(image=self._idle_photo, text=CAMERA_IDLE_TEXT)
+        
+        if self._drain_job is not None:
+            self.root.after_cancel(self._drain_job)
+            self._drain_job = None
+        
+        # Wait for the display thread (it polls with 0.1 s timeouts) so a quick restart
+        # never has two threads sharing _rgb_src and the buffer pool
+        if self.display_thread is not None:
+            self.display_thread.join(timeout=1.0)
+            self.display_thread = None
+        with self._frame_lock:
+            self._latest_frame = None
+        try:
+            self._display_queue.get_nowait()
+        except queue.Empty:
+            pass
         
         # Stop any currently playing chord
         if self.currently_playing_chord != 0:
@@ -357,7 +561,27 @@ class ChordEditor:
         # Ensure all MIDI notes are stopped
         self.midi_controller.stop_all_notes()
         
+        # Release the camera once the recognition thread is out of process_frame
+        self.gesture_button.config(state=tk.DISABLED)
+        self._finish_gesture_stop()
+    
+    def _finish_gesture_stop(self, block: bool = False):
+        """Stop the camera after the gesture thread exits.
+        
+        The thread may be waiting on root.after, so rather than joining on the Tk
+        thread this polls from the event loop. block=True joins instead (on exit).
+        """
+        thread = self.gesture_thread
+        if thread is not None and thread.is_alive():
+            if block:
+                thread.join(timeout=1.0)
+            else:
+                self.root.after(20, self._finish_gesture_stop)
+                return
+        self.gesture_thread = None
+        
         self.gesture_recognizer.stop_camera()
+        self.gesture_button.config(state=tk.NORMAL)
         self.current_gesture_label.config(text="No gesture detected")
         self.status_label.config(text="Gesture mode stopped")
     
@@ -370,8 +594,8 @@ class ChordEditor:
                 frame, finger_count = self.gesture_recognizer.process_frame()
                 
                 if frame is not None:
-                    # Update camera display
-                    self.update_camera_display(frame)
+                    # Hand the frame to the display thread, replacing any unconverted one
+                    self.queue_display_frame(frame)
                     
                     # Update gesture status
                     self.root.after(0, self.update_gesture_status, finger_count)
@@ -383,25 +607,97 @@ class ChordEditor:
                     last_gesture = finger_count
                 
             except Exception as e:
-                print(f"Gesture recognition error: {e}")
+                log.exception("Gesture recognition error: %s", e)
                 break
     
-    def update_camera_display(self, frame):
-        """Update the camera display with the current frame"""
+    def queue_display_frame(self, frame):
+        """Offer a frame to the display thread, dropping one it hasn't taken yet"""
+        try:
+            self._display_queue.get_nowait()
+        except queue.Empty:
+            pass
         try:
-            # Convert frame to PhotoImage
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            # Large camera view for better hand detection visibility
-            frame_resized = cv2.resize(frame_rgb, (800, 600))  # Even larger!
-            image = Image.fromarray(frame_resized)
-            photo = ImageTk.PhotoImage(image)
+            self._display_queue.put_nowait(frame)
+        except queue.Full:
+            pass
+    
+    def display_preprocess_loop(self):
+        """Convert queued camera frames for display until the camera stops"""
+        while self.camera_running:
+            try:
+                frame = self._display_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
             
-            # Update label - remove text constraints and let image size determine display
-            self.camera_label.config(image=photo, width=800, height=600)
-            self.camera_label.image = photo  # Keep a reference
+            # Nobody can see the camera view - skip the conversion entirely
+            if not self._display_visible:
+                continue
+            
+            try:
+                buffer = self._free_buffers.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            
+            try:
+                display_frame = self.prepare_display_frame(frame, buffer)
+            except Exception as e:
+                log.exception("Camera display error: %s", e)
+                self._free_buffers.put(buffer)
+                continue
+            
+            # Hand the frame to the Tk thread, replacing any undrawn one
+            with self._frame_lock:
+                replaced = self._latest_frame
+                self._latest_frame = display_frame
+            if replaced is not None:
+                self._free_buffers.put(replaced)
+    
+    def _drain_frame(self):
+        """Display the latest camera frame and reschedule while the camera runs"""
+        with self._frame_lock:
+            frame = self._latest_frame
+            self._latest_frame = None
+        
+        # Skip the upload while the window is minimized or the view is unmapped
+        self._display_visible = (self.root.state() != 'iconic' and
+                                 bool(self.camera_label.winfo_ismapped()))
+        
+        if frame is not None:
+            if self._display_visible:
+                self.update_camera_display(frame)
+            self._free_buffers.put(frame)
+        
+        if self.camera_running:
+            self._drain_job = self.root.after(33, self._drain_frame)
+        else:
+            self._drain_job = None
+    
+    def prepare_display_frame(self, frame, dst):
+        """Convert a BGR camera frame into dst, an RGB array sized for the camera view"""
+        if self._use_umat:
+            # OpenCL path: convert on the device, then copy into the display buffer
+            rgb = cv2.cvtColor(cv2.UMat(frame), cv2.COLOR_BGR2RGB)
+            resized = cv2.resize(rgb, CAMERA_VIEW_SIZE, interpolation=cv2.INTER_AREA)
+            np.copyto(dst, resized.get())
+            return dst
+        
+        if self._rgb_src is None or self._rgb_src.shape != frame.shape:
+            self._rgb_src = np.empty_like(frame)
+        
+        # Write into preallocated arrays so no per-frame buffers are allocated
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self._rgb_src)
+        cv2.resize(self._rgb_src, CAMERA_VIEW_SIZE, dst=dst, interpolation=cv2.INTER_AREA)
+        return dst
+    
+    def update_camera_display(self, frame):
+        """Update the camera display with an RGB frame from prepare_display_frame"""
+        try:
+            # Write the pixels into the existing Tk image instead of creating a new one
+            image = Image.frombuffer('RGB', CAMERA_VIEW_SIZE, frame, 'raw', 'RGB', 0, 1)
+            self._photo.paste(image)
             
         except Exception as e:
-            print(f"Camera display error: {e}")
+            log.exception("Camera display error: %s", e)
     
     def update_gesture_status(self, finger_count):
         """Update the gesture status label"""
@@ -412,26 +708,26 @@ class ChordEditor:
     
     def trigger_gesture_chord(self, chord_number):
         """Trigger a chord based on gesture"""
-        # print(f"Gesture trigger: current={self.currently_playing_chord}, new={chord_number}")
+        log.debug("Gesture trigger: current=%s, new=%s", self.currently_playing_chord, chord_number)
         
         # Always stop current chord first if there is one
         if self.currently_playing_chord != 0:
-            # print(f"Stopping current chord {self.currently_playing_chord}")
+            log.debug("Stopping current chord %s", self.currently_playing_chord)
             self.midi_controller.stop_chord(self.currently_playing_chord)
             self.currently_playing_chord = 0
         
         if 1 <= chord_number <= 5:
-            # print(f"Starting new chord {chord_number}")
+            log.debug("Starting new chord %s", chord_number)
             # Start new chord
             self.midi_controller.play_chord(chord_number)
             self.currently_playing_chord = chord_number
             
             # Highlight the corresponding chord
-            chord_notes = set(self.midi_controller.get_chord(chord_number))
+            chord_notes = self._chord_sets.get(chord_number, frozenset())
             self.piano_roll.set_highlighted_notes(chord_notes)
         else:
             # No fingers detected - clear highlight
-            # print("No fingers - clearing highlight")
+            log.debug("No fingers - clearing highlight")
             self.piano_roll.set_highlighted_notes(set())
     
     def save_configuration(self):
@@ -444,12 +740,16 @@ class ChordEditor:
     
     def load_configuration(self):
         """Load configuration from file"""
+        # The reloaded chords replace any edit still waiting on the debounce
+        self._discard_pending_notes()
+        # Write out pending autosaved changes before re-reading the file
+        self.config_manager.flush()
         self.config_manager = ConfigManager()
         
         # Load MIDI controller chords
         chords = self.config_manager.get_chords()
         for chord_num, notes in chords.items():
-            self.midi_controller.set_chord(chord_num, notes)
+            self.set_chord_notes(chord_num, notes)
         
         # Load MIDI settings
         midi_settings = self.config_manager.get_midi_settings()
@@ -484,10 +784,12 @@ class ChordEditor:
         
         if filename:
             if self.config_manager.import_chords(filename):
+                # Imported chords replace any edit still waiting on the debounce
+                self._discard_pending_notes()
                 # Reload chords into MIDI controller
                 chords = self.config_manager.get_chords()
                 for chord_num, notes in chords.items():
-                    self.midi_controller.set_chord(chord_num, notes)
+                    self.set_chord_notes(chord_num, notes)
                 
                 self.update_chord_display()
                 messagebox.showinfo("Import", f"Chords imported from {filename}")
@@ -532,8 +834,12 @@ Version 1.0"""
     
     def on_closing(self):
         """Handle application closing"""
+        # Apply a piano roll edit still waiting on the debounce so it gets saved
+        self._commit_notes()
+        
         if self.is_gesture_mode:
             self.stop_gesture_mode()
+            self._finish_gesture_stop(block=True)
         
         self.midi_controller.disconnect()
         self.config_manager.save_config()
@@ -543,6 +849,9 @@ Version 1.0"""
         """Start the application"""
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
         
+        # Debug messages stay silent unless the level is lowered
+        logging.basicConfig(level=logging.WARNING)
+        
         # Initialize with first chord selected
         self.select_chord(1)
         self.refresh_midi_devices()
@@ -1,42 +1,90 @@
+import copy
 import json
 import os
-from typing import Dict, List, Any
+import tempfile
+import threading
+from typing import Dict, List, Any, Optional
 from pathlib import Path
+from midi_base import NOTE_NAMES
+
+try:
+    import orjson  # Optional, much faster JSON encode/decode
+except ImportError:
+    orjson = None
+
+def _json_loads(data: bytes) -> Any:
+    """Decode JSON bytes, using orjson when available"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def _json_dumps(obj: Any, indent: bool = True) -> bytes:
+    """Encode an object as JSON bytes, using orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else None)
+    return json.dumps(obj, indent=2 if indent else None).encode('utf-8')
+
+# Chord keys as stored in the config file
+_VALID_CHORD_KEYS = frozenset(str(i) for i in range(1, 6))
+
+# Default configuration; get_default_config hands out deep copies
+_DEFAULT_CONFIG = {
+    "chords": {
+        "1": [60, 64, 67],  # C Major
+        "2": [62, 66, 69],  # D Minor
+        "3": [64, 68, 71],  # E Minor
+        "4": [65, 69, 72],  # F Major
+        "5": [67, 71, 74]   # G Major
+    },
+    "midi_settings": {
+        "device_id": None,
+        "velocity": 100,
+        "channel": 0
+    },
+    "gesture_settings": {
+        "stability_threshold": 0.7,
+        "history_length": 5,
+        "camera_index": 0,
+        "opencv_threads": None,  # None = half the CPU cores
+        "use_worker_process": False  # Run MediaPipe in a separate process
+    },
+    "ui_settings": {
+        "window_width": 1000,
+        "window_height": 700,
+        "piano_width": 900,
+        "piano_height": 200
+    }
+}
+
+def _fill_missing_defaults(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Add any missing sections, settings and chords from the defaults, in place"""
+    for key, value in _DEFAULT_CONFIG.items():
+        if key not in config:
+            config[key] = copy.deepcopy(value)
+        elif isinstance(value, dict):
+            for subkey, subvalue in value.items():
+                if subkey not in config[key]:
+                    config[key][subkey] = copy.deepcopy(subvalue)
+    return config
 
 class ConfigManager:
     """Manages saving and loading of application configuration"""
     
-    def __init__(self, config_file: str = "air_midi_config.json"):
+    def __init__(self, config_file: str = "air_midi_config.json", autosave_delay: Optional[float] = 0.5):
         self.config_file = Path(config_file)
         self.config = self.load_config()
+        
+        # Write-behind saving: changes are coalesced and written after autosave_delay
+        # seconds of quiet. None disables autosave; save_config() always works.
+        self.autosave_delay = autosave_delay
+        self._dirty = False
+        self._save_timer: Optional[threading.Timer] = None
+        self._lock = threading.RLock()
+        self._write_lock = threading.Lock()
     
     def get_default_config(self) -> Dict[str, Any]:
         """Get default configuration"""
-        return {
-            "chords": {
-                "1": [60, 64, 67],  # C Major
-                "2": [62, 66, 69],  # D Minor
-                "3": [64, 68, 71],  # E Minor
-                "4": [65, 69, 72],  # F Major
-                "5": [67, 71, 74]   # G Major
-            },
-            "midi_settings": {
-                "device_id": None,
-                "velocity": 100,
-                "channel": 0
-            },
-            "gesture_settings": {
-                "stability_threshold": 0.7,
-                "history_length": 5,
-                "camera_index": 0
-            },
-            "ui_settings": {
-                "window_width": 1000,
-                "window_height": 700,
-                "piano_width": 900,
-                "piano_height": 200
-            }
-        }
+        return copy.deepcopy(_DEFAULT_CONFIG)
     
     def load_config(self) -> Dict[str, Any]:
         """Load configuration from file"""
@@ -44,34 +92,64 @@ class ConfigManager:
             return self.get_default_config()
         
         try:
-            with open(self.config_file, 'r') as f:
-                config = json.load(f)
+            with open(self.config_file, 'rb') as f:
+                data = f.read()
             
-            # Ensure all required keys exist
-            default_config = self.get_default_config()
-            for key, value in default_config.items():
-                if key not in config:
-                    config[key] = value
-                elif isinstance(value, dict):
-                    for subkey, subvalue in value.items():
-                        if subkey not in config[key]:
-                            config[key][subkey] = subvalue
+            return _fill_missing_defaults(_json_loads(data))
             
-            return config
-            
-        except (json.JSONDecodeError, IOError) as e:
+        except (json.JSONDecodeError, IOError) as e:  # Also catches orjson.JSONDecodeError
             print(f"Error loading config: {e}")
             return self.get_default_config()
     
     def save_config(self) -> bool:
         """Save configuration to file"""
-        try:
-            with open(self.config_file, 'w') as f:
-                json.dump(self.config, f, indent=2)
-            return True
-        except IOError as e:
-            print(f"Error saving config: {e}")
-            return False
+        # _write_lock orders whole saves (snapshot through replace), so an older snapshot
+        # can never land after a newer one; _lock is only held while taking the snapshot
+        with self._write_lock:
+            with self._lock:
+                self._cancel_save_timer()
+                # The config is machine-read, so skip indentation when orjson is doing the work
+                data = _json_dumps(self.config, indent=orjson is None)
+                self._dirty = False
+            
+            # Write a temp file and swap it in so a crash never leaves a truncated config
+            tmp_file = None
+            try:
+                fd, tmp_file = tempfile.mkstemp(dir=self.config_file.parent,
+                                                prefix=self.config_file.name, suffix='.tmp')
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_file, self.config_file)
+                return True
+            except IOError as e:
+                print(f"Error saving config: {e}")
+                if tmp_file is not None and os.path.exists(tmp_file):
+                    os.remove(tmp_file)
+                return False
+    
+    def flush(self) -> bool:
+        """Write any pending changes now (call before exiting)"""
+        with self._lock:
+            dirty = self._dirty
+        if dirty:
+            return self.save_config()
+        return True
+    
+    def _mark_dirty(self):
+        """Record a change and (re)start the autosave timer"""
+        self._dirty = True
+        if self.autosave_delay is None:
+            return
+        self._cancel_save_timer()
+        self._save_timer = threading.Timer(self.autosave_delay, self.flush)
+        self._save_timer.daemon = True
+        self._save_timer.start()
+    
+    def _cancel_save_timer(self):
+        """Cancel a pending autosave"""
+        if self._save_timer is not None:
+            self._save_timer.cancel()
+            self._save_timer = None
     
     def get_chords(self) -> Dict[int, List[int]]:
         """Get chord configurations"""
@@ -87,7 +165,9 @@ class ConfigManager:
     
     def set_chord(self, chord_number: int, notes: List[int]):
         """Set chord configuration"""
-        self.config["chords"][str(chord_number)] = notes
+        with self._lock:
+            self.config["chords"][str(chord_number)] = notes
+            self._mark_dirty()
     
     def get_midi_settings(self) -> Dict[str, Any]:
         """Get MIDI settings"""
@@ -95,9 +175,11 @@ class ConfigManager:
     
     def set_midi_settings(self, **kwargs):
         """Set MIDI settings"""
-        for key, value in kwargs.items():
-            if key in self.config["midi_settings"]:
-                self.config["midi_settings"][key] = value
+        with self._lock:
+            for key, value in kwargs.items():
+                if key in self.config["midi_settings"]:
+                    self.config["midi_settings"][key] = value
+            self._mark_dirty()
     
     def get_gesture_settings(self) -> Dict[str, Any]:
         """Get gesture recognition settings"""
@@ -105,9 +187,11 @@ class ConfigManager:
     
     def set_gesture_settings(self, **kwargs):
         """Set gesture recognition settings"""
-        for key, value in kwargs.items():
-            if key in self.config["gesture_settings"]:
-                self.config["gesture_settings"][key] = value
+        with self._lock:
+            for key, value in kwargs.items():
+                if key in self.config["gesture_settings"]:
+                    self.config["gesture_settings"][key] = value
+            self._mark_dirty()
     
     def get_ui_settings(self) -> Dict[str, Any]:
         """Get UI settings"""
@@ -115,13 +199,17 @@ class ConfigManager:
     
     def set_ui_settings(self, **kwargs):
         """Set UI settings"""
-        for key, value in kwargs.items():
-            if key in self.config["ui_settings"]:
-                self.config["ui_settings"][key] = value
+        with self._lock:
+            for key, value in kwargs.items():
+                if key in self.config["ui_settings"]:
+                    self.config["ui_settings"][key] = value
+            self._mark_dirty()
     
     def reset_to_defaults(self):
         """Reset configuration to defaults"""
-        self.config = self.get_default_config()
+        with self._lock:
+            self.config = self.get_default_config()
+            self._mark_dirty()
     
     def export_chords(self, filename: str) -> bool:
         """Export chord configurations to a separate file"""
@@ -130,8 +218,8 @@ class ConfigManager:
                 "chords": self.config["chords"],
                 "exported_from": "Air MIDI Controller"
             }
-            with open(filename, 'w') as f:
-                json.dump(chords_data, f, indent=2)
+            with open(filename, 'wb') as f:
+                f.write(_json_dumps(chords_data))
             return True
         except IOError as e:
             print(f"Error exporting chords: {e}")
@@ -140,32 +228,29 @@ class ConfigManager:
     def import_chords(self, filename: str) -> bool:
         """Import chord configurations from a file"""
         try:
-            with open(filename, 'r') as f:
-                data = json.load(f)
+            with open(filename, 'rb') as f:
+                data = _json_loads(f.read())
             
             if "chords" in data:
-                # Validate chord data
-                for key, value in data["chords"].items():
-                    try:
-                        chord_num = int(key)
-                        if isinstance(value, list) and 1 <= chord_num <= 5:
-                            # Validate MIDI notes
-                            valid_notes = [note for note in value 
-                                         if isinstance(note, int) and 0 <= note <= 127]
-                            self.config["chords"][key] = valid_notes
-                    except (ValueError, TypeError):
-                        continue
+                with self._lock:
+                    # Validate chord data
+                    for key, value in data["chords"].items():
+                        # Only chords 1-5 with a list of notes are accepted
+                        if not (isinstance(value, list) and key in _VALID_CHORD_KEYS):
+                            continue
+                        # Validate MIDI notes
+                        self.config["chords"][key] = [note for note in value
+                                                      if isinstance(note, int) and 0 <= note <= 127]
+                    self._mark_dirty()
                 return True
             return False
             
-        except (json.JSONDecodeError, IOError) as e:
+        except (json.JSONDecodeError, IOError) as e:  # Also catches orjson.JSONDecodeError
             print(f"Error importing chords: {e}")
             return False
     
     def get_config_summary(self) -> str:
         """Get a human-readable summary of the configuration"""
-        from midi_controller import MIDIController
-        
         summary = "Air MIDI Controller Configuration:\n\n"
         
         # Chords
@@ -173,7 +258,7 @@ class ConfigManager:
         for i in range(1, 6):
             chord = self.config["chords"].get(str(i), [])
             if chord:
-                note_names = [MIDIController.note_to_name(note) for note in chord]
+                note_names = [NOTE_NAMES[note] if 0 <= note <= 127 else "Invalid" for note in chord]
                 summary += f"  Chord {i}: {note_names} (MIDI: {chord})\n"
             else:
                 summary += f"  Chord {i}: Not set\n"
@@ -196,28 +281,28 @@ class ConfigManager:
 
 def test_config_manager():
     """Test function for configuration manager"""
-    config = ConfigManager("test_config.json")
-    
-    print("Default configuration loaded:")
-    print(config.get_config_summary())
-    
-    # Modify some settings
-    config.set_chord(1, [48, 52, 55])  # C Major in a lower octave
-    config.set_midi_settings(velocity=80, channel=1)
-    config.set_gesture_settings(stability_threshold=0.8)
-    
-    print("\nAfter modifications:")
-    print(config.get_config_summary())
-    
-    # Save and reload
-    config.save_config()
-    
-    config2 = ConfigManager("test_config.json")
-    print("\nAfter save/reload:")
-    print(config2.get_config_summary())
+    # Use tmpfs when available so the round trip never touches the disk
+    tmp_root = "/dev/shm" if os.path.isdir("/dev/shm") else None
+    with tempfile.TemporaryDirectory(dir=tmp_root) as tmp_dir:
+        config = ConfigManager(os.path.join(tmp_dir, "test_config.json"), autosave_delay=None)
+        
+        print("Default configuration loaded:")
+        print(config.get_config_summary())
+        
+        # Modify some settings
+        config.set_chord(1, [48, 52, 55])  # C Major in a lower octave
+        config.set_midi_settings(velocity=80, channel=1)
+        config.set_gesture_settings(stability_threshold=0.8)
+        
+        print("\nAfter modifications:")
+        print(config.get_config_summary())
+        
+        # Save and reload into the same instance
+        config.save_config()
+        config.config = config.load_config()
+        print("\nAfter save/reload:")
+        print(config.get_config_summary())
     
-    # Clean up
-    os.remove("test_config.json")
     print("\nTest completed")
 
 if __name__ == "__main__":
@@ -4,13 +4,17 @@ import numpy as np
 from typing import Optional, List, Tuple
 import time
 import math
+import threading
+from collections import deque
 
 class GestureRecognizer:
-    def __init__(self):
+    def __init__(self, debug: bool = False):
+        self.debug = debug  # Print per-finger state every frame
         self.mp_hands = mp.solutions.hands
         self.hands = self.mp_hands.Hands(
             static_image_mode=False,
             max_num_hands=1,
+            model_complexity=0,  # Lite model - plenty for counting fingers, 2-3x faster
             min_detection_confidence=0.8,
             min_tracking_confidence=0.7
         )
@@ -23,17 +27,55 @@ class GestureRecognizer:
         # Palm landmarks for calculating palm center and radius
         self.palm_landmarks = [0, 1, 5, 9, 13, 17]  # Key palm points
         
+        # Index arrays for vectorized landmark lookups
+        self._palm_idx = np.array(self.palm_landmarks)
+        self._tip_idx = np.array(self.finger_tips)
+        
+        # Landmark coordinates of the current hand, filled once per frame by _to_xy
+        self._xy_buf = np.empty((21, 2), dtype=np.float32)
+        
         # Gesture stability - balanced for accuracy and responsiveness
-        self.gesture_history = []
         self.history_length = 4  # Reduced for less delay
+        self.gesture_history = deque(maxlen=self.history_length)
+        self._gesture_counts = [0] * 6  # Occurrences of 0-5 fingers in the history
         self.last_stable_gesture = 0
         self.stability_threshold = 0.75  # Balanced threshold
         
         # Camera setup
         self.cap = None
+        self.frame_interval = 1.0 / 30  # Expected time between camera frames
+        
+        # Background capture: the reader thread keeps only the newest frame
+        self._frame_slot = None  # (ret, frame) not yet taken by process_frame
+        self._frame_cond = threading.Condition()
+        self._reader_thread = None
+        self._running = False
+        self.inference_scale = 0.5  # MediaPipe sees a half-resolution copy of each frame
+        self._small_bgr = None  # Reused downscaled frame
+        self._rgb_buf = None  # Reused RGB input for MediaPipe
+        
+        # Temporal gating: reuse the last landmarks while the scene stays still
+        self.motion_threshold = 2.0  # Mean absolute difference (0-255) of the 40x30 thumbnails
+        self.max_reused_frames = 10  # Force fresh inference after this many reuses
+        self._reference_small = None  # Thumbnail of the last frame MediaPipe saw
+        self._cached_hands = None
+        self._reused_frames = 0
         
         # Palm circle parameters
         self.palm_radius_multiplier = 1.3  # Make circle 30% bigger than palm for better thumb detection
+        # Per-finger share of the palm radius a tip must exceed; the thumb gets a
+        # smaller threshold since it extends in a different direction
+        self._finger_thresholds = np.array([0.85, 1.0, 1.0, 1.0, 1.0])
+        self._finger_thresholds_sq = self._finger_thresholds ** 2
+        self._palm_mul_sq = self.palm_radius_multiplier ** 2
+        
+        # Heart outline at unit size, scaled and translated per frame in draw_heart.
+        # Heart equation: x = 16*sin^3(t), y = 13*cos(t) - 5*cos(2t) - 2*cos(3t) - cos(4t)
+        t = np.linspace(0, 2 * np.pi, 360, endpoint=False, dtype=np.float32)
+        self._heart_unit = np.stack([
+            16 * np.sin(t) ** 3,
+            -(13 * np.cos(t) - 5 * np.cos(2 * t) - 2 * np.cos(3 * t) - np.cos(4 * t))
+        ], axis=1) / 40.0
         
     def start_camera(self, camera_index: int = 0) -> bool:
         """Initialize camera capture"""
@@ -46,97 +88,115 @@ class GestureRecognizer:
         self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
         self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
         self.cap.set(cv2.CAP_PROP_FPS, 30)
+        
+        self._small_bgr = np.empty((240, 320, 3), dtype=np.uint8)
+        self._rgb_buf = np.empty((240, 320, 3), dtype=np.uint8)
+        self._reference_small = None
+        self._cached_hands = None
+        
+        # Capture on a background thread so reads overlap with inference
+        self._frame_slot = None
+        self._running = True
+        self._reader_thread = threading.Thread(target=self._reader_loop, daemon=True)
+        self._reader_thread.start()
         return True
     
     def stop_camera(self):
         """Release camera resources"""
+        self._running = False
+        if self._reader_thread:
+            self._reader_thread.join(timeout=1.0)
+            self._reader_thread = None
+        
         if self.cap:
             self.cap.release()
         cv2.destroyAllWindows()
     
-    def calculate_palm_circle(self, landmarks) -> tuple:
-        """Calculate palm center and radius based on hand landmarks"""
-        # Get palm points
-        palm_points = []
-        for idx in self.palm_landmarks:
-            palm_points.append([landmarks[idx].x, landmarks[idx].y])
-        
-        palm_points = np.array(palm_points)
+    def _reader_loop(self):
+        """Read camera frames continuously, replacing any frame not yet processed"""
+        while self._running:
+            ret, frame = self.cap.read()
+            with self._frame_cond:
+                self._frame_slot = (ret, frame)
+                self._frame_cond.notify()
+            
+            if not ret:
+                time.sleep(self.frame_interval)  # Don't spin on a failing camera
+    
+    def read_latest_frame(self, timeout: float = 0.5) -> Tuple[bool, Optional[np.ndarray]]:
+        """Take the newest frame from the reader thread, waiting for one if needed"""
+        with self._frame_cond:
+            self._frame_cond.wait_for(lambda: self._frame_slot is not None, timeout=timeout)
+            slot = self._frame_slot
+            self._frame_slot = None
+        
+        if slot is None:
+            return False, None
+        return slot
+    
+    def _to_xy(self, landmarks) -> np.ndarray:
+        """Copy the x/y of all 21 hand landmarks into the reused 21 x 2 array"""
+        out = self._xy_buf
+        for i in range(21):
+            point = landmarks[i]
+            out[i, 0] = point.x
+            out[i, 1] = point.y
+        return out
+    
+    def _analyze(self, xy: np.ndarray) -> tuple:
+        """Compute the palm circle and which fingers are extended in one pass.
         
-        # Calculate palm center (centroid of palm points)
-        palm_center_x = np.mean(palm_points[:, 0])
-        palm_center_y = np.mean(palm_points[:, 1])
+        Returns (palm_center, palm_radius, extended) where extended is a boolean
+        array with one entry per finger tip.
+        """
+        palm = xy[self._palm_idx]
+        tips = xy[self._tip_idx]
         
-        # Calculate palm radius (distance from center to furthest palm point)
-        distances = []
-        for point in palm_points:
-            dist = math.sqrt((point[0] - palm_center_x)**2 + (point[1] - palm_center_y)**2)
-            distances.append(dist)
+        # Palm center is the centroid; the squared radius reaches the furthest palm point
+        center = palm.mean(axis=0)
+        radius_sq = ((palm - center) ** 2).sum(axis=1).max() * self._palm_mul_sq
         
-        palm_radius = max(distances) * self.palm_radius_multiplier
+        # A finger is extended when its tip lies outside the palm circle
+        tip_dist_sq = ((tips - center) ** 2).sum(axis=1)
+        extended = tip_dist_sq > radius_sq * self._finger_thresholds_sq
         
-        return (palm_center_x, palm_center_y), palm_radius
+        return (float(center[0]), float(center[1])), math.sqrt(radius_sq), extended
     
-    def is_finger_outside_palm_circle(self, finger_tip, palm_center, palm_radius, is_thumb=False) -> bool:
-        """Check if finger tip is outside the palm circle"""
-        distance = math.sqrt(
-            (finger_tip.x - palm_center[0])**2 + 
-            (finger_tip.y - palm_center[1])**2
-        )
-        # Use smaller threshold for thumb since it extends in different direction
-        threshold_multiplier = 0.85 if is_thumb else 1.0
-        return distance > (palm_radius * threshold_multiplier)
+    def calculate_palm_circle(self, xy: np.ndarray) -> tuple:
+        """Calculate palm center and radius from the 21 x 2 landmark coordinates"""
+        palm_center, palm_radius, _ = self._analyze(xy)
+        return palm_center, palm_radius
     
-    def count_extended_fingers(self, landmarks, is_right_hand=True) -> int:
+    def count_extended_fingers(self, xy: np.ndarray, is_right_hand=True) -> int:
         """Count extended fingers using palm circle method"""
-        # Calculate palm circle
-        palm_center, palm_radius = self.calculate_palm_circle(landmarks)
+        _, _, extended = self._analyze(xy)
         
-        extended_fingers = 0
+        if self.debug:
+            print(", ".join(f"{name}: {'Extended' if is_extended else 'Folded'}"
+                            for name, is_extended in zip(self.finger_names, extended)))
         
-        # Check each finger tip
-        for i, tip_id in enumerate(self.finger_tips):
-            finger_tip = landmarks[tip_id]
-            is_thumb = (i == 0)  # First finger is thumb
-            
-            # Check if finger tip is outside palm circle
-            if self.is_finger_outside_palm_circle(finger_tip, palm_center, palm_radius, is_thumb):
-                extended_fingers += 1
-                print(f"{self.finger_names[i]}: Extended (outside palm circle)")
-            else:
-                print(f"{self.finger_names[i]}: Folded (inside palm circle)")
-        
-        return extended_fingers
+        return int(np.count_nonzero(extended))
     
-    def is_right_hand(self, landmarks) -> bool:
+    def is_right_hand(self, xy: np.ndarray) -> bool:
         """Determine if the detected hand is the right hand"""
-        # Compare thumb and pinky positions
-        thumb_x = landmarks[4].x  # Thumb tip
-        pinky_x = landmarks[20].x  # Pinky tip
-        
-        # For right hand, thumb should be on the right side of pinky
-        return thumb_x > pinky_x
+        # For right hand, thumb tip should be on the right side of pinky tip
+        return bool(xy[4, 0] > xy[20, 0])
     
     def get_stable_gesture(self, current_fingers: int) -> int:
         """Apply stability filtering to gesture recognition"""
+        # The deque evicts the oldest entry on append; keep the counts in step
+        if len(self.gesture_history) == self.history_length:
+            self._gesture_counts[self.gesture_history[0]] -= 1
         self.gesture_history.append(current_fingers)
-        
-        # Keep only recent history
-        if len(self.gesture_history) > self.history_length:
-            self.gesture_history.pop(0)
+        self._gesture_counts[current_fingers] += 1
         
         # Check if we have enough history
         if len(self.gesture_history) < self.history_length:
             return self.last_stable_gesture
         
-        # Count occurrences of each gesture
-        gesture_counts = {}
-        for gesture in self.gesture_history:
-            gesture_counts[gesture] = gesture_counts.get(gesture, 0) + 1
-        
         # Find the most frequent gesture
-        most_frequent_gesture = max(gesture_counts, key=gesture_counts.get)
-        stability_ratio = gesture_counts[most_frequent_gesture] / len(self.gesture_history)
+        most_frequent_gesture = max(range(6), key=self._gesture_counts.__getitem__)
+        stability_ratio = self._gesture_counts[most_frequent_gesture] / len(self.gesture_history)
         
         # Update stable gesture if stability threshold is met
         if stability_ratio >= self.stability_threshold:
@@ -150,32 +210,50 @@ class GestureRecognizer:
         pink = (203, 192, 255)  # Light pink
         thickness = 3
         
-        # Heart shape using curves and lines
-        # Calculate heart points
-        heart_points = []
-        for i in range(360):
-            angle = math.radians(i)
-            # Heart equation: x = 16*sin^3(t), y = 13*cos(t) - 5*cos(2t) - 2*cos(3t) - cos(4t)
-            x = 16 * (math.sin(angle) ** 3)
-            y = -(13 * math.cos(angle) - 5 * math.cos(2*angle) - 2 * math.cos(3*angle) - math.cos(4*angle))
-            
-            # Scale and translate
-            x = int(center_x + (x * size / 40))
-            y = int(center_y + (y * size / 40))
-            heart_points.append((x, y))
-        
-        # Draw heart outline
-        for i in range(len(heart_points)):
-            start_point = heart_points[i]
-            end_point = heart_points[(i + 1) % len(heart_points)]
-            cv2.line(frame, start_point, end_point, pink, thickness)
+        # Scale and translate the cached outline, then draw it in one call
+        heart_points = (self._heart_unit * size + (center_x, center_y)).astype(np.int32)
+        cv2.polylines(frame, [heart_points], isClosed=True, color=pink,
+                      thickness=thickness, lineType=cv2.LINE_AA)
+    
+    def detect_hands(self, frame):
+        """Run MediaPipe on a BGR frame, reusing the last result if the scene hasn't moved"""
+        small = cv2.cvtColor(cv2.resize(frame, (40, 30), interpolation=cv2.INTER_AREA),
+                             cv2.COLOR_BGR2GRAY)
+        
+        if (self._reference_small is not None and
+                self._reused_frames < self.max_reused_frames and
+                cv2.absdiff(small, self._reference_small).mean() < self.motion_threshold):
+            self._reused_frames += 1
+            return self._cached_hands
+        
+        # Downscale and convert BGR to RGB into reused buffers. Landmarks are
+        # normalized, so they map straight back onto the full-size frame.
+        frame_height, frame_width = frame.shape[:2]
+        infer_shape = (int(frame_height * self.inference_scale),
+                       int(frame_width * self.inference_scale), 3)
+        if self._rgb_buf is None or self._rgb_buf.shape != infer_shape:
+            self._small_bgr = np.empty(infer_shape, dtype=np.uint8)
+            self._rgb_buf = np.empty(infer_shape, dtype=np.uint8)
+        cv2.resize(frame, (infer_shape[1], infer_shape[0]), dst=self._small_bgr,
+                   interpolation=cv2.INTER_AREA)
+        self._rgb_buf.flags.writeable = True
+        cv2.cvtColor(self._small_bgr, cv2.COLOR_BGR2RGB, dst=self._rgb_buf)
+        
+        # Process the frame; a read-only image lets MediaPipe skip its own copy
+        self._rgb_buf.flags.writeable = False
+        results = self.hands.process(self._rgb_buf)
+        
+        self._reference_small = small
+        self._cached_hands = results.multi_hand_landmarks
+        self._reused_frames = 0
+        return self._cached_hands
     
     def process_frame(self) -> Tuple[Optional[np.ndarray], int]:
         """Process one frame and return the frame and detected finger count"""
         if not self.cap:
             return None, 0
         
-        ret, frame = self.cap.read()
+        ret, frame = self.read_latest_frame()
         if not ret:
             return None, 0
         
@@ -183,49 +261,48 @@ class GestureRecognizer:
         frame = cv2.flip(frame, 1)
         frame_height, frame_width = frame.shape[:2]
         
-        # Convert BGR to RGB
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        
-        # Process the frame
-        results = self.hands.process(rgb_frame)
+        hands = self.detect_hands(frame)
         
         finger_count = 0
         
-        if results.multi_hand_landmarks:
+        if hands:
             # Priority: right hand first, then any hand
             right_hand = None
             any_hand = None
             
-            for hand_landmarks in results.multi_hand_landmarks:
-                if self.is_right_hand(hand_landmarks.landmark):
+            for hand_landmarks in hands:
+                xy = self._to_xy(hand_landmarks.landmark)
+                if self.is_right_hand(xy):
                     right_hand = hand_landmarks
                 else:
                     any_hand = hand_landmarks
             
             # Use right hand if available, otherwise use any hand
             selected_hand = right_hand if right_hand is not None else any_hand
+            if len(hands) > 1:
+                xy = self._to_xy(selected_hand.landmark)
             
             if selected_hand:
                 # Draw cute heart instead of hand skeleton
                 # Calculate heart position (center of palm with upward offset)
-                wrist = selected_hand.landmark[0]  # Wrist landmark
-                middle_mcp = selected_hand.landmark[9]  # Middle finger MCP
-                heart_x = int((wrist.x + middle_mcp.x) / 2 * frame_width)
-                heart_y = int((wrist.y + middle_mcp.y) / 2 * frame_height)
+                wrist = xy[0]  # Wrist landmark
+                middle_mcp = xy[9]  # Middle finger MCP
+                heart_x = int((wrist[0] + middle_mcp[0]) / 2 * frame_width)
+                heart_y = int((wrist[1] + middle_mcp[1]) / 2 * frame_height)
                 
                 # Move heart up by 40 pixels for better positioning
                 heart_y -= 40
                 
                 # Count extended fingers first
                 is_right = (selected_hand == right_hand)
-                raw_finger_count = self.count_extended_fingers(selected_hand.landmark, is_right)
+                raw_finger_count = self.count_extended_fingers(xy, is_right)
                 finger_count = self.get_stable_gesture(raw_finger_count)
                 
                 # Calculate hand size for base scaling
-                middle_tip = selected_hand.landmark[12]  # Middle finger tip
+                middle_tip = xy[12]  # Middle finger tip
                 hand_span = math.sqrt(
-                    ((middle_tip.x - wrist.x) * frame_width) ** 2 + 
-                    ((middle_tip.y - wrist.y) * frame_height) ** 2
+                    ((middle_tip[0] - wrist[0]) * frame_width) ** 2 + 
+                    ((middle_tip[1] - wrist[1]) * frame_height) ** 2
                 )
                 
                 # Base heart size (smaller than before)
@@ -0,0 +1,149 @@
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import numpy as np
+import time
+from typing import Optional, Tuple
+
+# Shape of the frames published by the worker (height, width, channels)
+FRAME_SHAPE = (480, 640, 3)
+
+# Slots of the shared state array
+STATE_FINGERS = 0  # Stable finger count for the published frame
+STATE_SEQUENCE = 1  # Incremented for every published frame
+STATE_STATUS = 2  # 0 = starting, 1 = camera running, -1 = camera failed
+
+def _worker_main(shm_name, frame_shape, state, started, frame_ready, stop_event, camera_index):
+    """Worker process entry point: capture, recognize and publish annotated frames"""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    frame_buf = np.ndarray(frame_shape, dtype=np.uint8, buffer=shm.buf)
+    recognizer = None
+
+    try:
+        # Inside the try so an import or MediaPipe failure still reports back to the client
+        import cv2
+        from gesture_recognition import GestureRecognizer
+        recognizer = GestureRecognizer()
+        if not recognizer.start_camera(camera_index):
+            return
+
+        state[STATE_STATUS] = 1
+        started.set()
+
+        while not stop_event.is_set():
+            frame, finger_count = recognizer.process_frame()
+            if frame is None:
+                continue
+
+            if frame.shape != frame_shape:
+                frame = cv2.resize(frame, (frame_shape[1], frame_shape[0]))
+
+            with state.get_lock():
+                frame_buf[:] = frame
+                state[STATE_FINGERS] = finger_count
+                state[STATE_SEQUENCE] += 1
+            frame_ready.set()
+    finally:
+        # A worker that exits before its camera started reports failure
+        if not started.is_set():
+            state[STATE_STATUS] = -1
+        started.set()
+        if recognizer is not None:
+            recognizer.stop_camera()
+        del frame_buf
+        shm.close()
+
+class GestureWorkerClient:
+    """Runs GestureRecognizer in a separate process and reads its results.
+
+    The worker owns the camera and MediaPipe and writes each annotated frame
+    into shared memory, so inference does not compete with the Tk thread for
+    the GIL. Provides the same camera API as GestureRecognizer.
+    """
+
+    def __init__(self, frame_shape: Tuple[int, int, int] = FRAME_SHAPE, startup_timeout: float = 30.0):
+        # Spawn rather than fork: forking a process that runs Tk and threads is unsafe
+        self._ctx = mp.get_context('spawn')
+        self.frame_shape = frame_shape
+        self.startup_timeout = startup_timeout  # Importing MediaPipe can take seconds
+
+        self._process = None
+        self._shm = None
+        self._frame = None
+        self._state = None
+        self._frame_ready = None
+        self._stop_event = None
+        self._last_sequence = 0
+
+    def start_camera(self, camera_index: int = 0) -> bool:
+        """Start the worker process and wait until its camera is open"""
+        size = int(np.prod(self.frame_shape))
+        self._shm = shared_memory.SharedMemory(create=True, size=size)
+        self._frame = np.ndarray(self.frame_shape, dtype=np.uint8, buffer=self._shm.buf)
+        self._state = self._ctx.Array('i', 3)
+        self._frame_ready = self._ctx.Event()
+        self._stop_event = self._ctx.Event()
+        self._last_sequence = 0
+        started = self._ctx.Event()
+
+        self._process = self._ctx.Process(
+            target=_worker_main,
+            args=(self._shm.name, self.frame_shape, self._state, started,
+                  self._frame_ready, self._stop_event, camera_index),
+            daemon=True
+        )
+        self._process.start()
+
+        # Wait in short slices so a worker that dies during startup is noticed at once
+        deadline = time.monotonic() + self.startup_timeout
+        while not started.wait(timeout=0.1):
+            if not self._process.is_alive() or time.monotonic() > deadline:
+                break
+
+        if self._state[STATE_STATUS] != 1:
+            print(f"Error: Gesture worker could not start camera {camera_index}")
+            self.stop_camera()
+            return False
+        return True
+
+    def stop_camera(self):
+        """Stop the worker process and release shared memory"""
+        if self._process is not None:
+            self._stop_event.set()
+            self._process.join(timeout=2.0)
+            if self._process.is_alive():
+                self._process.terminate()
+            self._process = None
+
+        if self._shm is not None:
+            self._frame = None
+            try:
+                self._shm.close()
+            except BufferError:
+                pass  # A reader still holds the view; the mapping goes away with it
+            self._shm.unlink()
+            self._shm = None
+
+    def process_frame(self) -> Tuple[Optional[np.ndarray], int]:
+        """Return the newest annotated frame and finger count from the worker"""
+        # Read everything into locals: stop_camera may clear these from another thread
+        process, shared, state, frame_ready = self._process, self._frame, self._state, self._frame_ready
+        if process is None or shared is None:
+            return None, 0
+
+        if not frame_ready.wait(timeout=0.5):
+            if self._process is None:
+                return None, 0  # Stopped while waiting
+            if not process.is_alive():
+                raise RuntimeError(f"Gesture worker exited with code {process.exitcode}")
+            return None, 0
+        frame_ready.clear()
+
+        with state.get_lock():
+            sequence = state[STATE_SEQUENCE]
+            if sequence == self._last_sequence or self._frame is None:
+                return None, 0
+            frame = shared.copy()
+            finger_count = state[STATE_FINGERS]
+
+        self._last_sequence = sequence
+        return frame, finger_count
@@ -27,46 +27,27 @@ Version: 1.0
 
 import sys
 import os
+import multiprocessing
+from importlib.util import find_spec
 import tkinter as tk
 from tkinter import messagebox
 import traceback
 
 def check_dependencies():
     """Check if all required dependencies are installed"""
-    missing_deps = []
-    
-    try:
-        import cv2
-    except ImportError:
-        missing_deps.append("opencv-python")
-    
-    try:
-        import mediapipe
-    except ImportError:
-        missing_deps.append("mediapipe")
-    
-    try:
-        import pygame
-    except ImportError:
-        missing_deps.append("pygame")
-    
-    try:
-        import numpy
-    except ImportError:
-        missing_deps.append("numpy")
-    
-    try:
-        from PIL import Image, ImageTk
-    except ImportError:
-        missing_deps.append("Pillow")
-    
-    return missing_deps
+    # pip package name -> import name. find_spec only locates the module, so
+    # heavy imports like MediaPipe are paid later, by the code that uses them.
+    required = {
+        "opencv-python": "cv2",
+        "mediapipe": "mediapipe",
+        "pygame": "pygame",
+        "numpy": "numpy",
+        "Pillow": "PIL",
+    }
+    return [dep for dep, module in required.items() if find_spec(module) is None]
 
-def show_dependency_error(missing_deps):
+def show_dependency_error(missing_deps, root):
     """Show error dialog for missing dependencies"""
-    root = tk.Tk()
-    root.withdraw()  # Hide the main window
-    
     message = f"""Missing required dependencies: {', '.join(missing_deps)}
 
 To install the missing dependencies, run:
@@ -77,8 +58,7 @@ Or install all requirements:
 
 pip install -r requirements.txt"""
     
-    messagebox.showerror("Missing Dependencies", message)
-    root.destroy()
+    messagebox.showerror("Missing Dependencies", message, parent=root)
 
 def check_camera_access():
     """Check if camera is accessible"""
@@ -97,6 +77,10 @@ def main():
     print("Air MIDI - Hand Gesture Chord Controller")
     print("=" * 50)
     
+    # One hidden Tk root serves every startup dialog and then the application itself
+    root = tk.Tk()
+    root.withdraw()
+    
     # Check dependencies
     print("Checking dependencies...")
     missing_deps = check_dependencies()
@@ -105,7 +89,8 @@ def main():
         print(f"ERROR: Missing dependencies: {', '.join(missing_deps)}")
         print("Please install them using:")
         print(f"pip install {' '.join(missing_deps)}")
-        show_dependency_error(missing_deps)
+        show_dependency_error(missing_deps, root)
+        root.destroy()
         sys.exit(1)
     
     print("✓ All dependencies found")
@@ -116,16 +101,15 @@ def main():
         print("WARNING: Camera not accessible. Gesture recognition will not work.")
         print("Please ensure your camera is connected and not in use by another application.")
         
-        root = tk.Tk()
-        root.withdraw()
         result = messagebox.askyesno(
             "Camera Warning", 
             "Camera not accessible. Continue anyway?\n\n"
-            "You can still use the chord editor, but gesture recognition will not work."
+            "You can still use the chord editor, but gesture recognition will not work.",
+            parent=root
         )
-        root.destroy()
         
         if not result:
+            root.destroy()
             sys.exit(1)
     else:
         print("✓ Camera accessible")
@@ -135,7 +119,7 @@ def main():
         print("Starting Air MIDI application...")
         from chord_editor import ChordEditor
         
-        app = ChordEditor()
+        app = ChordEditor(root)
         app.run()
         
     except Exception as e:
@@ -143,16 +127,21 @@ def main():
         print("\nFull error traceback:")
         traceback.print_exc()
         
-        # Show error dialog
-        root = tk.Tk()
-        root.withdraw()
+        # Show error dialog, on a fresh root if the application already destroyed ours
+        try:
+            root.withdraw()
+        except tk.TclError:
+            root = tk.Tk()
+            root.withdraw()
         messagebox.showerror(
             "Application Error", 
             f"Failed to start Air MIDI:\n\n{str(e)}\n\n"
-            "Check the console for more details."
+            "Check the console for more details.",
+            parent=root
         )
         root.destroy()
         sys.exit(1)
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # Needed for the gesture worker in frozen builds
     main()
\ No newline at end of file
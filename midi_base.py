@@ -0,0 +1,363 @@
+import abc
+import heapq
+import logging
+import os
+import sys
+import time
+from types import MappingProxyType
+from typing import List, Dict, Set, Tuple, Mapping
+import threading
+
+# Name of every MIDI note 0-127, e.g. 60 -> "C4"
+_PITCH_CLASSES = ('C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B')
+NOTE_NAMES = tuple(f"{_PITCH_CLASSES[n % 12]}{n // 12 - 1}" for n in range(128))
+
+def _build_name_to_note() -> Dict[str, int]:
+    """Map upper-case note names, including flat spellings, to MIDI notes"""
+    flats = {'C#': 'DB', 'D#': 'EB', 'F#': 'GB', 'G#': 'AB', 'A#': 'BB'}
+    table = {}
+    for note in range(128):
+        pitch, octave = _PITCH_CLASSES[note % 12], note // 12 - 1
+        table[f"{pitch}{octave}"] = note
+        if pitch in flats:
+            table[f"{flats[pitch]}{octave}"] = note
+    return table
+
+_NAME_TO_NOTE = _build_name_to_note()
+
+log = logging.getLogger(__name__)
+
+def _raise_thread_priority():
+    """Ask the OS to run the calling thread at real-time/time-critical priority"""
+    try:
+        if sys.platform == 'win32':
+            import ctypes
+            kernel32 = ctypes.windll.kernel32
+            THREAD_PRIORITY_TIME_CRITICAL = 15
+            if not kernel32.SetThreadPriority(kernel32.GetCurrentThread(), THREAD_PRIORITY_TIME_CRITICAL):
+                raise OSError(ctypes.GetLastError(), "SetThreadPriority failed")
+        elif hasattr(os, 'sched_setscheduler'):
+            # On Linux pid 0 is the calling thread; needs CAP_SYS_NICE or an rtprio limit
+            os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(10))
+        else:
+            return
+        log.debug("MIDI scheduler thread running at elevated priority")
+    except (OSError, AttributeError) as e:
+        log.debug("Could not raise MIDI scheduler thread priority: %s", e)
+
+def _notes_mask(notes) -> int:
+    """Bitmap with bit n set for every valid MIDI note n in notes"""
+    mask = 0
+    for note in notes:
+        if 0 <= note <= 127:
+            mask |= 1 << note
+    return mask
+
+class MIDIControllerBase(abc.ABC):
+    """Chord storage, note tracking and note-off scheduling shared by the MIDI backends.
+    
+    Backends open the output device and implement the _send_* methods; everything
+    that does not touch the device lives here.
+    """
+    
+    def __init__(self):
+        # Currently playing notes as a bitmap (bit n = MIDI note n). Updated from both the
+        # caller's thread and the scheduler thread, so read-modify-writes take _notes_lock.
+        self._mask = 0
+        self._notes_lock = threading.Lock()
+        self.velocity = 100  # Default velocity
+        self.channel = 0  # MIDI channel (0-15)
+        
+        # Default chord configurations (MIDI note numbers)
+        self.default_chords = {
+            1: (60, 64, 67),        # C Major (C, E, G)
+            2: (62, 66, 69),        # D Minor (D, F, A)
+            3: (64, 68, 71),        # E Minor (E, G, B)
+            4: (65, 69, 72),        # F Major (F, A, C)
+            5: (67, 71, 74)         # G Major (G, B, D)
+        }
+        
+        # Chords are stored as tuples so they can be handed out without copying
+        self.chords = dict(self.default_chords)
+        self._rebuild_message_cache()
+        
+        # Pending note-offs as a (monotonic_ns deadline, note) heap, served by one persistent thread
+        self._scheduler_queue = []
+        self._sched_cv = threading.Condition()
+        self._scheduler_thread = threading.Thread(target=self._scheduler_loop, daemon=True)
+        self._scheduler_thread.start()
+    
+    @property
+    def current_notes(self) -> Set[int]:
+        """Currently playing notes"""
+        mask = self._mask
+        notes = set()
+        while mask:
+            lsb = mask & -mask
+            notes.add(lsb.bit_length() - 1)
+            mask ^= lsb
+        return notes
+    
+    # Backend interface
+    
+    @abc.abstractmethod
+    def is_connected(self) -> bool:
+        """Check whether an output device is open"""
+    
+    @abc.abstractmethod
+    def list_devices(self) -> Dict[int, str]:
+        """List available MIDI output devices"""
+    
+    @abc.abstractmethod
+    def connect(self, device_id=None) -> bool:
+        """Connect to MIDI output device"""
+    
+    @abc.abstractmethod
+    def _close_output(self):
+        """Close the output device"""
+    
+    @abc.abstractmethod
+    def _send_on(self, note: int, velocity: int):
+        """Send a single note on message"""
+    
+    @abc.abstractmethod
+    def _send_off(self, note: int):
+        """Send a single note off message"""
+    
+    def _send_retrigger(self, note: int, velocity: int):
+        """Restart a note that is already sounding"""
+        self._send_off(note)
+        self._send_on(note, velocity)
+    
+    def _send_chord_on(self, chord_number: int, notes: List[int]):
+        """Send note on messages for a configured chord"""
+        self._send_notes_on(notes)
+    
+    def _send_notes_on(self, notes):
+        """Send note on messages for a group of notes at the current velocity"""
+        mask = self._mask
+        for note in notes:
+            if mask >> note & 1:
+                self._send_retrigger(note, self.velocity)
+            else:
+                self._send_on(note, self.velocity)
+    
+    def _send_chord_off(self, chord_number: int, notes: List[int]):
+        """Send note off messages for a configured chord"""
+        for note in notes:
+            self._send_off(note)
+    
+    def _send_all_notes_off(self):
+        """Send a channel-wide all notes off, if the backend supports it"""
+    
+    def _rebuild_message_cache(self):
+        """Rebuild backend message caches after chords, velocity or channel change"""
+    
+    # Note-off scheduling
+    
+    def _scheduler_loop(self):
+        """Send scheduled note-offs when their deadlines pass"""
+        # Note-offs are rare and short, so real-time priority only trims wake-up jitter
+        _raise_thread_priority()
+        queue = self._scheduler_queue
+        while True:
+            with self._sched_cv:
+                while True:
+                    if not queue:
+                        self._sched_cv.wait()
+                        continue
+                    delay_ns = queue[0][0] - time.monotonic_ns()
+                    if delay_ns <= 0:
+                        break
+                    self._sched_cv.wait(timeout=delay_ns / 1e9)
+                
+                now = time.monotonic_ns()
+                due = []
+                while queue and queue[0][0] <= now:
+                    due.append(heapq.heappop(queue)[1])
+            
+            # Send outside the lock so play_chord is never blocked on MIDI output
+            for note in due:
+                try:
+                    self.note_off(note)
+                except Exception as e:
+                    log.error("Error stopping note %d: %s", note, e)
+    
+    def _schedule_note_offs(self, notes: List[int], duration: float, start_ns: int = None):
+        """Queue note-offs for the given notes duration seconds after start_ns (default now)"""
+        if start_ns is None:
+            start_ns = time.monotonic_ns()
+        deadline = start_ns + int(duration * 1e9)
+        with self._sched_cv:
+            for note in notes:
+                heapq.heappush(self._scheduler_queue, (deadline, note))
+            self._sched_cv.notify()
+    
+    # Playback
+    
+    def disconnect(self):
+        """Disconnect from MIDI device"""
+        with self._sched_cv:
+            self._scheduler_queue.clear()
+        
+        if self.is_connected():
+            self.stop_all_notes()
+            self._close_output()
+            print("MIDI device disconnected")
+    
+    def note_on(self, note: int, velocity: int = None):
+        """Send MIDI note on message"""
+        if not self.is_connected():
+            return
+        
+        if velocity is None:
+            velocity = self.velocity
+        
+        # Re-trigger sounding notes so they can't get stuck
+        if self._mask >> note & 1:
+            self._send_retrigger(note, velocity)
+        else:
+            self._send_on(note, velocity)
+        with self._notes_lock:
+            self._mask |= 1 << note
+    
+    def note_off(self, note: int):
+        """Send MIDI note off message"""
+        if not self.is_connected():
+            return
+        
+        self._send_off(note)
+        with self._notes_lock:
+            self._mask &= ~(1 << note)
+    
+    def play_chord(self, chord_number: int, duration: float = None):
+        """Play a chord based on gesture number (1-5)"""
+        if not self.is_connected():
+            log.debug("MIDI not connected - cannot play chord")
+            return
+        
+        if chord_number not in self.chords:
+            log.debug("Chord %d not configured", chord_number)
+            return
+        
+        start_ns = time.monotonic_ns()
+        chord = self.chords[chord_number]
+        try:
+            self._send_chord_on(chord_number, chord)
+        except Exception as e:
+            log.error("Error playing chord %d: %s", chord_number, e)
+        log.debug("Playing chord %d: %s", chord_number, chord)
+        with self._notes_lock:
+            self._mask |= _notes_mask(chord)
+        
+        # If duration is specified, stop notes after duration
+        if duration:
+            self._schedule_note_offs(chord, duration, start_ns)
+    
+    def play_notes(self, notes, duration: float = None):
+        """Play an arbitrary group of notes together"""
+        if not self.is_connected():
+            return
+        
+        # Only send, track and schedule notes MIDI can actually play
+        notes = [note for note in notes if 0 <= note <= 127]
+        if not notes:
+            return
+        
+        start_ns = time.monotonic_ns()
+        try:
+            self._send_notes_on(notes)
+        except Exception as e:
+            log.error("Error playing notes %s: %s", sorted(notes), e)
+        with self._notes_lock:
+            self._mask |= _notes_mask(notes)
+        
+        if duration:
+            self._schedule_note_offs(notes, duration, start_ns)
+    
+    def stop_chord(self, chord_number: int):
+        """Stop playing a chord"""
+        if not self.is_connected():
+            return
+        
+        if chord_number not in self.chords:
+            return
+        
+        chord = self.chords[chord_number]
+        try:
+            self._send_chord_off(chord_number, chord)
+        except Exception as e:
+            log.error("Error stopping chord %d: %s", chord_number, e)
+        log.debug("Stopping chord %d: %s", chord_number, chord)
+        with self._notes_lock:
+            self._mask &= ~_notes_mask(chord)
+    
+    def stop_all_notes(self):
+        """Stop all currently playing notes"""
+        if not self.is_connected():
+            return
+        
+        with self._notes_lock:
+            mask = self._mask
+            self._mask = 0
+        
+        # Walk the set bits lowest first; keep going past failures so disconnect() can finish
+        while mask:
+            lsb = mask & -mask
+            note = lsb.bit_length() - 1
+            try:
+                self._send_off(note)
+            except Exception as e:
+                log.error("Error stopping note %d: %s", note, e)
+            mask ^= lsb
+        try:
+            self._send_all_notes_off()
+        except Exception as e:
+            log.error("Error sending all notes off: %s", e)
+    
+    # Chord configuration
+    
+    def set_chord(self, chord_number: int, notes: List[int]):
+        """Set custom chord configuration"""
+        if 1 <= chord_number <= 5:
+            # Drop notes MIDI can't express (e.g. from a hand-edited config) instead of
+            # failing later when backends prebuild their messages
+            valid = tuple(note for note in notes if isinstance(note, int) and 0 <= note <= 127)
+            if len(valid) != len(notes):
+                log.warning("Ignoring invalid notes in chord %d: %s",
+                            chord_number, [note for note in notes if note not in valid])
+            self.chords[chord_number] = valid
+            self._rebuild_message_cache()
+    
+    def get_chord(self, chord_number: int) -> Tuple[int, ...]:
+        """Get chord configuration"""
+        return self.chords.get(chord_number, ())
+    
+    def get_all_chords(self) -> Mapping[int, Tuple[int, ...]]:
+        """Get all chord configurations as a read-only view"""
+        return MappingProxyType(self.chords)
+    
+    def reset_to_defaults(self):
+        """Reset chords to default configurations"""
+        self.chords = dict(self.default_chords)
+        self._rebuild_message_cache()
+    
+    def set_velocity(self, velocity: int):
+        """Set MIDI velocity (0-127)"""
+        self.velocity = max(0, min(127, velocity))
+        self._rebuild_message_cache()
+    
+    def set_channel(self, channel: int):
+        """Set MIDI channel (0-15)"""
+        self.channel = max(0, min(15, channel))
+        self._rebuild_message_cache()
+    
+    @staticmethod
+    def note_to_name(note: int) -> str:
+        """Convert MIDI note number to note name"""
+        return NOTE_NAMES[note] if 0 <= note <= 127 else "Invalid"
+    
+    @staticmethod
+    def name_to_note(note_name: str) -> int:
+        """Convert note name to MIDI note number"""
+        return _NAME_TO_NOTE.get(note_name.upper(), -1)
@@ -2,30 +2,27 @@ import pygame
 import pygame.midi
 import time
 from typing import List, Dict, Optional
-import threading
+from midi_base import MIDIControllerBase
 
-class MIDIController:
-    def __init__(self, device_id: Optional[int] = None):
+class MIDIController(MIDIControllerBase):
+    """MIDI output through pygame.midi (PortMidi)"""
+    
+    def __init__(self, device_id: Optional[int] = None, latency_ms: int = 1, buffer_size: int = 128):
         """Initialize MIDI controller"""
         pygame.midi.init()
         
         self.device_id = device_id
         self.midi_out = None
-        self.current_notes = set()  # Track currently playing notes
-        self.velocity = 100  # Default velocity
-        self.channel = 0  # MIDI channel (0-15)
-        
-        # Default chord configurations (MIDI note numbers)
-        self.default_chords = {
-            1: [60, 64, 67],        # C Major (C, E, G)
-            2: [62, 66, 69],        # D Minor (D, F, A)
-            3: [64, 68, 71],        # E Minor (E, G, B)
-            4: [65, 69, 72],        # F Major (F, A, C)
-            5: [67, 71, 74]         # G Major (G, B, D)
-        }
-        
-        self.chords = self.default_chords.copy()
-        
+        self.latency_ms = latency_ms  # Non-zero so PortMidi honors event timestamps
+        # Small output queue: a chord is a handful of events, and a deep queue only
+        # lets a backlog build up behind new notes
+        self.buffer_size = buffer_size
+        super().__init__()
+    
+    def is_connected(self) -> bool:
+        """Check whether an output device is open"""
+        return self.midi_out is not None
+    
     def list_devices(self) -> Dict[int, str]:
         """List available MIDI output devices"""
         devices = {}
@@ -50,7 +47,7 @@ class MIDIController:
                     return False
                 device_id = list(devices.keys())[0]
             
-            self.midi_out = pygame.midi.Output(device_id)
+            self.midi_out = pygame.midi.Output(device_id, latency=self.latency_ms, buffer_size=self.buffer_size)
             self.device_id = device_id
             print(f"Connected to MIDI device {device_id}")
             return True
@@ -61,148 +58,45 @@ class MIDIController:
     
     def disconnect(self):
         """Disconnect from MIDI device"""
-        if self.midi_out:
-            self.stop_all_notes()
-            self.midi_out.close()
-            self.midi_out = None
+        super().disconnect()
         pygame.midi.quit()
     
-    def note_on(self, note: int, velocity: int = None):
-        """Send MIDI note on message"""
-        if not self.midi_out:
-            return
-        
-        if velocity is None:
-            velocity = self.velocity
-        
-        # Ensure note is off first to avoid stuck notes
-        if note in self.current_notes:
-            self.midi_out.note_off(note, 0, self.channel)
-            time.sleep(0.001)  # Small delay
-            
+    def _close_output(self):
+        """Close the output device"""
+        self.midi_out.close()
+        self.midi_out = None
+    
+    def _send_on(self, note: int, velocity: int):
+        """Send a single note on message"""
         self.midi_out.note_on(note, velocity, self.channel)
-        self.current_notes.add(note)
     
-    def note_off(self, note: int):
-        """Send MIDI note off message"""
-        if not self.midi_out:
-            return
-            
+    def _send_off(self, note: int):
+        """Send a single note off message"""
         self.midi_out.note_off(note, 0, self.channel)
-        self.current_notes.discard(note)
-    
-    def play_chord(self, chord_number: int, duration: float = None):
-        """Play a chord based on gesture number (1-5)"""
-        if not self.midi_out:
-            print("MIDI not connected - cannot play chord")
-            return
-            
-        if chord_number not in self.chords:
-            print(f"Chord {chord_number} not configured")
-            return
-        
-        chord = self.chords[chord_number]
-        print(f"Playing chord {chord_number}: {chord}")
-        
-        # Play all notes in the chord
-        for note in chord:
-            try:
-                self.note_on(note, self.velocity)
-                print(f"Note ON: {note} ({self.note_to_name(note)})")
-            except Exception as e:
-                print(f"Error playing note {note}: {e}")
-        
-        # If duration is specified, stop notes after duration
-        if duration:
-            def stop_chord():
-                time.sleep(duration)
-                for note in chord:
-                    self.note_off(note)
-            
-            thread = threading.Thread(target=stop_chord)
-            thread.daemon = True
-            thread.start()
     
-    def stop_chord(self, chord_number: int):
-        """Stop playing a chord"""
-        if not self.midi_out:
-            return
-            
-        if chord_number not in self.chords:
-            return
-        
-        chord = self.chords[chord_number]
-        print(f"Stopping chord {chord_number}: {chord}")
-        
-        for note in chord:
-            try:
-                self.note_off(note)
-                print(f"Note OFF: {note} ({self.note_to_name(note)})")
-            except Exception as e:
-                print(f"Error stopping note {note}: {e}")
-    
-    def stop_all_notes(self):
-        """Stop all currently playing notes"""
-        for note in list(self.current_notes):
-            self.note_off(note)
-    
-    def set_chord(self, chord_number: int, notes: List[int]):
-        """Set custom chord configuration"""
-        if 1 <= chord_number <= 5:
-            self.chords[chord_number] = notes.copy()
-    
-    def get_chord(self, chord_number: int) -> List[int]:
-        """Get chord configuration"""
-        return self.chords.get(chord_number, [])
-    
-    def get_all_chords(self) -> Dict[int, List[int]]:
-        """Get all chord configurations"""
-        return self.chords.copy()
-    
-    def reset_to_defaults(self):
-        """Reset chords to default configurations"""
-        self.chords = self.default_chords.copy()
-    
-    def set_velocity(self, velocity: int):
-        """Set MIDI velocity (0-127)"""
-        self.velocity = max(0, min(127, velocity))
-    
-    def set_channel(self, channel: int):
-        """Set MIDI channel (0-15)"""
-        self.channel = max(0, min(15, channel))
-
-    @staticmethod
-    def note_to_name(note: int) -> str:
-        """Convert MIDI note number to note name"""
-        if note < 0 or note > 127:
-            return "Invalid"
-        
-        notes = ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']
-        octave = (note // 12) - 1
-        note_name = notes[note % 12]
-        return f"{note_name}{octave}"
-    
-    @staticmethod
-    def name_to_note(note_name: str) -> int:
-        """Convert note name to MIDI note number"""
-        notes = {'C': 0, 'C#': 1, 'DB': 1, 'D': 2, 'D#': 3, 'EB': 3, 'E': 4, 
-                'F': 5, 'F#': 6, 'GB': 6, 'G': 7, 'G#': 8, 'AB': 8, 'A': 9, 
-                'A#': 10, 'BB': 10, 'B': 11}
-        
-        # Parse note name (e.g., "C4", "F#3")
-        if len(note_name) < 2:
-            return -1
-        
-        note_part = note_name[:-1].upper()
-        try:
-            octave_part = int(note_name[-1])
-        except ValueError:
-            return -1
-        
-        if note_part not in notes:
-            return -1
-        
-        return (octave_part + 1) * 12 + notes[note_part]
+    def _send_retrigger(self, note: int, velocity: int):
+        """Restart a sounding note, sending the note off and note on in one write"""
+        self.midi_out.write([[[0x80 | self.channel, note, 0], 0],
+                             [[0x90 | self.channel, note, velocity], 0]])
+    
+    def _send_notes_on(self, notes):
+        """Submit all notes in one timestamped write so they sound together"""
+        now = pygame.midi.time()
+        note_off_status = 0x80 | self.channel
+        note_on_status = 0x90 | self.channel
+        mask = self._mask
+        events = []
+        for note in notes:
+            if mask >> note & 1:
+                events.append([[note_off_status, note, 0], now])
+            events.append([[note_on_status, note, self.velocity], now])
+        self.midi_out.write(events)
+    
+    def _send_chord_off(self, chord_number: int, notes: List[int]):
+        """Submit all note offs in one timestamped write"""
+        now = pygame.midi.time()
+        note_off_status = 0x80 | self.channel
+        self.midi_out.write([[[note_off_status, note, 0], now] for note in notes])
 
 def test_midi_controller():
     """Test function for MIDI controller"""
@@ -1,7 +1,15 @@
 import tkinter as tk
 from tkinter import Canvas
-from typing import Set, Callable, Optional, Dict
-from midi_controller import MIDIController
+import math
+from typing import Set, Callable, Optional, Dict, List, Tuple
+import numpy as np
+from midi_base import MIDIControllerBase
+
+# Whether each pitch class (C, C#, D, ..., B) is a black key
+_IS_BLACK = (False, True, False, True, False, False, True, False, True, False, True, False)
+
+# Black key shift in white key widths by pitch class (C#, D#, F#, G#, A#)
+_BLACK_KEY_SHIFT = np.array([0, 0, 0, 1, 0, 0, 1, 0, 2, 0, 3, 0], dtype=float)
 
 class PianoRoll(Canvas):
     """Interactive piano keyboard widget for chord editing"""
@@ -34,12 +42,18 @@ class PianoRoll(Canvas):
         self.black_key_width = 0
         self.black_key_height = height * 0.6
         
-        # Note layout
-        self.white_notes = [0, 2, 4, 5, 7, 9, 11]  # C, D, E, F, G, A, B
-        self.black_notes = [1, 3, 6, 8, 10]        # C#, D#, F#, G#, A#
-        
-        # Key rectangles for click detection
+        # Key rectangles for drawing and click detection, rebuilt by calculate_key_positions
         self.key_rects: Dict[int, tuple] = {}
+        self._geom: Tuple[tuple, ...] = ()  # (x, y, width, height) for each note from start_note
+        self._base_color: Tuple[str, ...] = ()  # Unselected fill color for each note from start_note
+        self._draw_order: Tuple[int, ...] = ()  # White keys, then black keys
+        self._key_items: Dict[int, int] = {}  # Canvas item id of each key rectangle
+        self._pixel_to_white: List[Optional[int]] = []  # White key under each x pixel
+        self._pixel_to_black: List[Optional[int]] = []  # Black key under each x pixel
+        
+        # Latest drag position, applied once per idle tick
+        self._pending_drag = (0, 0)
+        self._drag_scheduled = False
         
         self.bind('<Button-1>', self.on_click)
         self.bind('<B1-Motion>', self.on_drag)
@@ -48,117 +62,120 @@ class PianoRoll(Canvas):
     
     def calculate_key_positions(self):
         """Calculate positions and sizes of piano keys"""
-        # Count white keys in the range
-        white_key_count = 0
-        for note in range(self.start_note, self.end_note + 1):
-            if (note % 12) in self.white_notes:
-                white_key_count += 1
+        notes = np.arange(self.start_note, self.end_note + 1)
+        pitch = notes % 12
+        is_white = ~np.array(_IS_BLACK)[pitch]
+        white_key_count = int(is_white.sum())
         
         self.white_key_width = (self.width - 40) / white_key_count if white_key_count > 0 else 20
         self.black_key_width = self.white_key_width * 0.6
+        
+        # Each key starts after the white keys to its left; black keys are then shifted
+        white_idx = np.cumsum(is_white) - is_white
+        black_offsets = _BLACK_KEY_SHIFT * self.white_key_width - self.black_key_width * 0.5
+        
+        geom = np.empty((len(notes), 4))
+        geom[:, 0] = 20 + white_idx * self.white_key_width + np.where(is_white, 0, black_offsets[pitch])
+        geom[:, 1] = 10
+        geom[:, 2] = np.where(is_white, self.white_key_width, self.black_key_width)
+        geom[:, 3] = np.where(is_white, self.white_key_height, self.black_key_height)
+        
+        # Per-note tables indexed by note - start_note: (x, y, width, height) and unselected
+        # fill color, plus the drawing order (white keys, then black keys on top)
+        self._geom = tuple(map(tuple, geom.tolist()))
+        self._base_color = tuple(
+            self.black_key_color if _IS_BLACK[note % 12] else self.white_key_color
+            for note in range(self.start_note, self.end_note + 1)
+        )
+        all_notes = range(self.start_note, self.end_note + 1)
+        self._draw_order = (tuple(n for n in all_notes if not _IS_BLACK[n % 12]) +
+                            tuple(n for n in all_notes if _IS_BLACK[n % 12]))
+        
+        # Rectangles for click detection
+        self.key_rects = {
+            note: (x, y, x + width, y + height)
+            for note, (x, y, width, height) in zip(range(self.start_note, self.end_note + 1), self._geom)
+        }
+        
+        # Note under each pixel column, separately for white and black keys. Notes are
+        # filled from the top down so the lower of two touching keys wins, as before.
+        columns = int(self.width) + 1
+        self._pixel_to_white = [None] * columns
+        self._pixel_to_black = [None] * columns
+        for note in range(self.end_note, self.start_note - 1, -1):
+            x1, _, x2, _ = self.key_rects[note]
+            lookup = self._pixel_to_black if _IS_BLACK[note % 12] else self._pixel_to_white
+            for px in range(max(0, math.ceil(x1)), min(columns - 1, math.floor(x2)) + 1):
+                lookup[px] = note
     
     def is_black_key(self, note: int) -> bool:
         """Check if a MIDI note is a black key"""
-        return (note % 12) in self.black_notes
+        return _IS_BLACK[note % 12]
     
     def get_key_position(self, note: int) -> tuple:
         """Get the x, y, width, height of a key"""
         if note < self.start_note or note > self.end_note:
             return (0, 0, 0, 0)
-        
-        # Calculate white key index
-        white_key_index = 0
-        for n in range(self.start_note, note + 1):
-            if (n % 12) in self.white_notes:
-                if n < note:
-                    white_key_index += 1
-        
-        x = 20 + white_key_index * self.white_key_width
-        
-        if self.is_black_key(note):
-            # Black key positioning
-            note_in_octave = note % 12
-            if note_in_octave == 1:  # C#
-                x -= self.black_key_width * 0.5
-            elif note_in_octave == 3:  # D#
-                x += self.white_key_width - self.black_key_width * 0.5
-            elif note_in_octave == 6:  # F#
-                x += self.white_key_width - self.black_key_width * 0.5
-            elif note_in_octave == 8:  # G#
-                x += self.white_key_width * 2 - self.black_key_width * 0.5
-            elif note_in_octave == 10:  # A#
-                x += self.white_key_width * 3 - self.black_key_width * 0.5
-            
-            return (x, 10, self.black_key_width, self.black_key_height)
-        else:
-            # White key
-            return (x, 10, self.white_key_width, self.white_key_height)
+        return self._geom[note - self.start_note]
     
     def draw_keyboard(self):
         """Draw the piano keyboard"""
         self.delete('all')
+        self._key_items.clear()
         self.calculate_key_positions()
-        self.key_rects.clear()
         
-        # Draw white keys first
-        for note in range(self.start_note, self.end_note + 1):
-            if not self.is_black_key(note):
-                self.draw_key(note)
-        
-        # Draw black keys on top
-        for note in range(self.start_note, self.end_note + 1):
-            if self.is_black_key(note):
-                self.draw_key(note)
+        for note in self._draw_order:
+            self.draw_key(note)
     
     def draw_key(self, note: int):
         """Draw a single piano key"""
-        x, y, width, height = self.get_key_position(note)
-        
-        if width <= 0 or height <= 0:
+        index = note - self.start_note
+        if not 0 <= index < len(self._geom):
             return
-        
-        # Determine key color
-        base_color = self.black_key_color if self.is_black_key(note) else self.white_key_color
-        
-        # Apply state colors
-        if note in self.selected_notes:
-            color = self.selected_color
-        elif note in self.highlighted_notes:
-            color = self.highlighted_color
-        else:
-            color = base_color
+        x, y, width, height = self._geom[index]
         
         # Draw key
         key_id = self.create_rectangle(
             x, y, x + width, y + height,
-            fill=color, outline=self.border_color, width=1
+            fill=self.get_key_color(note), outline=self.border_color, width=1
         )
-        
-        # Store key rectangle for click detection
-        self.key_rects[note] = (x, y, x + width, y + height)
+        self._key_items[note] = key_id
         
         # Add note label for C notes
-        if note % 12 == 0 and not self.is_black_key(note):
+        if note % 12 == 0:
             octave = (note // 12) - 1
             self.create_text(
                 x + width/2, y + height - 15,
                 text=f'C{octave}', font=('Arial', 8), fill='gray'
             )
     
+    def get_key_color(self, note: int) -> str:
+        """Get the fill color of a key from its selection state"""
+        if note in self.selected_notes:
+            return self.selected_color
+        if note in self.highlighted_notes:
+            return self.highlighted_color
+        index = note - self.start_note
+        if 0 <= index < len(self._base_color):
+            return self._base_color[index]
+        return self.black_key_color if _IS_BLACK[note % 12] else self.white_key_color
+    
+    def _recolor(self, note: int):
+        """Update the fill of an already drawn key"""
+        key_id = self._key_items.get(note)
+        if key_id is not None:
+            self.itemconfig(key_id, fill=self.get_key_color(note))
+    
     def get_note_at_position(self, x: int, y: int) -> Optional[int]:
         """Get the MIDI note at the given screen position"""
-        # Check black keys first (they're on top)
-        for note in range(self.start_note, self.end_note + 1):
-            if self.is_black_key(note):
-                rect = self.key_rects.get(note)
-                if rect and rect[0] <= x <= rect[2] and rect[1] <= y <= rect[3]:
-                    return note
+        if not 0 <= x < len(self._pixel_to_white):
+            return None
         
-        # Check white keys
-        for note in range(self.start_note, self.end_note + 1):
-            if not self.is_black_key(note):
-                rect = self.key_rects.get(note)
-                if rect and rect[0] <= x <= rect[2] and rect[1] <= y <= rect[3]:
+        # Check the black key first (it's on top), then the white key below it
+        for note in (self._pixel_to_black[x], self._pixel_to_white[x]):
+            if note is not None:
+                rect = self.key_rects[note]
+                if rect[1] <= y <= rect[3]:
                     return note
         
         return None
@@ -171,7 +188,16 @@ class PianoRoll(Canvas):
     
     def on_drag(self, event):
         """Handle mouse drag across piano keys"""
-        note = self.get_note_at_position(event.x, event.y)
+        # Keep only the latest position; motion events between idle ticks are coalesced
+        self._pending_drag = (event.x, event.y)
+        if not self._drag_scheduled:
+            self._drag_scheduled = True
+            self.after_idle(self._flush_drag)
+    
+    def _flush_drag(self):
+        """Apply the most recent drag position"""
+        self._drag_scheduled = False
+        note = self.get_note_at_position(*self._pending_drag)
         if note is not None and note not in self.selected_notes:
             self.add_note(note)
     
@@ -186,20 +212,22 @@ class PianoRoll(Canvas):
         """Add a note to selection"""
         if note not in self.selected_notes:
             self.selected_notes.add(note)
-            self.draw_key(note)
+            self._recolor(note)
             self.notify_change()
     
     def remove_note(self, note: int):
         """Remove a note from selection"""
         if note in self.selected_notes:
             self.selected_notes.remove(note)
-            self.draw_key(note)
+            self._recolor(note)
             self.notify_change()
     
     def set_selected_notes(self, notes: Set[int], notify: bool = True):
         """Set the selected notes"""
-        self.selected_notes = notes.copy()
-        self.draw_keyboard()
+        changed = self.selected_notes.symmetric_difference(notes)
+        self.selected_notes = set(notes)
+        for note in changed:
+            self._recolor(note)
         if notify:
             self.notify_change()
     
@@ -209,29 +237,31 @@ class PianoRoll(Canvas):
     
     def set_highlighted_notes(self, notes: Set[int]):
         """Set notes to highlight (for preview)"""
-        self.highlighted_notes = notes.copy()
-        self.draw_keyboard()
+        changed = self.highlighted_notes.symmetric_difference(notes)
+        self.highlighted_notes = set(notes)
+        for note in changed:
+            self._recolor(note)
     
     def clear_selection(self):
         """Clear all selected notes"""
-        self.selected_notes.clear()
-        self.draw_keyboard()
+        changed = self.selected_notes
+        self.selected_notes = set()
+        for note in changed:
+            self._recolor(note)
         self.notify_change()
     
     def notify_change(self):
         """Notify callback of selection change"""
         if self.on_note_change:
-            self.on_note_change(self.selected_notes.copy())
+            self.on_note_change(frozenset(self.selected_notes))
     
-    def play_selected_notes(self, midi_controller: MIDIController, duration: float = 1.0):
+    def play_selected_notes(self, midi_controller: MIDIControllerBase, duration: float = 1.0):
         """Play the currently selected notes"""
-        for note in self.selected_notes:
-            midi_controller.note_on(note)
-        
-        # Schedule note off
-        self.after(int(duration * 1000), lambda: self.stop_selected_notes(midi_controller))
+        # Snapshot the selection so the note-offs match the notes that were started,
+        # even if the selection changes before they are due
+        midi_controller.play_notes(frozenset(self.selected_notes), duration)
     
-    def stop_selected_notes(self, midi_controller: MIDIController):
+    def stop_selected_notes(self, midi_controller: MIDIControllerBase):
         """Stop playing the currently selected notes"""
         for note in self.selected_notes:
             midi_controller.note_off(note)
@@ -248,7 +278,7 @@ def test_piano_roll():
     
     # Add some test functionality
     def on_note_change(notes):
-        note_names = [MIDIController.note_to_name(note) for note in sorted(notes)]
+        note_names = [MIDIControllerBase.note_to_name(note) for note in sorted(notes)]
         print(f"Selected notes: {note_names}")
     
     piano.on_note_change = on_note_change